@@ -0,0 +1,39 @@
+import asyncio
+import os
+import sys
+from pathlib import Path
+from loguru import logger
+
+# Add the project root directory to Python path
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+from src.carriers.base import get_playwright, launch_args, stop_playwright
+from src.runtime import run
+
+DEBUG_PORT = int(os.getenv("BROWSER_DAEMON_PORT", "9222"))
+
+async def main():
+    """Keep a warm Chromium running for carrier runs to attach to over CDP"""
+    playwright = await get_playwright()
+    headless = os.getenv("HEADLESS", "true").lower() == "true"
+    browser = await playwright.chromium.launch(
+        headless=headless,
+        args=launch_args(headless) + [f"--remote-debugging-port={DEBUG_PORT}"]
+    )
+    logger.info(f"Browser ready, run carriers with CDP_WS_URL=http://localhost:{DEBUG_PORT}")
+    
+    closed = asyncio.Event()
+    browser.on("disconnected", lambda _: closed.set())
+    try:
+        await closed.wait()
+    finally:
+        if browser.is_connected():
+            await browser.close()
+        await stop_playwright()
+
+if __name__ == "__main__":
+    try:
+        run(main())
+    except KeyboardInterrupt:
+        logger.info("Browser daemon stopped")
@@ -1,52 +1,341 @@
+from __future__ import annotations
+
 from abc import ABC, abstractmethod
-from playwright.async_api import Page, Browser, async_playwright
-from loguru import logger
-from typing import Optional
+import asyncio
+from typing import Optional, TYPE_CHECKING
 import os
-from dotenv import load_dotenv
+import random
+import time
+from types import MappingProxyType
+
+if TYPE_CHECKING:
+    from playwright.async_api import Page, Browser, BrowserContext, Playwright
+    from .pool import BrowserPool
+
+# Only parse .env once per process, however many modules import this one
+if not os.environ.get("DOTENV_LOADED"):
+    from dotenv import load_dotenv
+    load_dotenv()
+    os.environ["DOTENV_LOADED"] = "1"
+
+# --start-maximized is not used since the context viewport sets the window size
+BROWSER_ARGS: tuple[str, ...] = ()
+DOCKER_ARGS: tuple[str, ...] = ('--no-sandbox', '--disable-dev-shm-usage')
+VIEWPORT = MappingProxyType({'width': 1920, 'height': 1080})
+
+def launch_args(headless: bool = False) -> list[str]:
+    """Build the Chromium command line flags for this environment"""
+    args = list(BROWSER_ARGS)
+    if headless:
+        args.append('--headless=new')
+    if os.path.exists('/.dockerenv'):
+        args.extend(DOCKER_ARGS)
+    return args
+
+class TransientError(Exception):
+    """A failure worth retrying, such as a 5xx response from a carrier portal"""
+
+async def retry_with_backoff(func, max_retries: int = 3, base: float = 1.0, cap: float = 30.0,
+                             jitter: float = 0.5):
+    """Await func(), retrying transient failures with jittered exponential backoff
+    
+    Playwright timeouts and TransientError are retried; anything else, such as
+    rejected credentials, is raised immediately.
+    """
+    from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+    
+    for attempt in range(max_retries + 1):
+        try:
+            return await func()
+        except (PlaywrightTimeoutError, TransientError) as e:
+            if attempt == max_retries:
+                raise
+            delay = min(cap, base * 2 ** attempt) * (1 + random.random() * jitter)
+            _get_logger().warning(f"Attempt {attempt + 1} failed ({str(e)}), retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+_logger = None
+
+def _get_logger():
+    """Import loguru on first use"""
+    global _logger
+    if _logger is None:
+        from loguru import logger
+        _logger = logger
+    return _logger
 
-load_dotenv()
+_playwright: Optional[Playwright] = None
+_playwright_lock = asyncio.Lock()
+
+async def get_playwright() -> Playwright:
+    """Return the process-wide Playwright driver, starting it on first use"""
+    global _playwright
+    if _playwright is None:
+        async with _playwright_lock:
+            if _playwright is None:
+                from playwright.async_api import async_playwright
+                _playwright = await async_playwright().start()
+    return _playwright
+
+async def stop_playwright():
+    """Stop the process-wide Playwright driver once all browsers are closed"""
+    global _playwright
+    async with _playwright_lock:
+        if _playwright is not None:
+            await _playwright.stop()
+            _playwright = None
 
 class BaseCarrier(ABC):
-    def __init__(self):
+    """Base class for carrier portal automations
+    
+    Instances use __slots__, so subclasses should declare their own __slots__
+    for any attributes they add to keep instances free of a __dict__.
+    """
+    __slots__ = ("pool", "browser", "context", "page", "restored_state")
+    
+    # Chromium process shared by every carrier that isn't given a pool
+    _shared_browser: Optional[Browser] = None
+    _owns_shared_browser = False
+    _shared_lock = asyncio.Lock()
+    
+    # Default timeout for the wait_and_* helpers
+    FAST_TIMEOUT_MS = 2500
+    
+    # File used to persist cookies and local storage between runs, if any
+    STORAGE_STATE_PATH: Optional[str] = None
+    # Maximum age in seconds before a persisted session is ignored; None keeps it forever
+    STORAGE_STATE_TTL: Optional[float] = None
+    
+    # Browser permissions to grant each context; subclasses opt in as needed
+    REQUIRED_PERMISSIONS: tuple[str, ...] = ()
+    
+    # Resource types to abort, e.g. {"image", "font", "media", "stylesheet"}
+    # for carriers that only need the DOM
+    BLOCK_RESOURCE_TYPES: frozenset[str] = frozenset()
+    
+    # URL substrings to abort regardless of type, e.g. analytics hosts
+    BLOCK_URL_PATTERNS: tuple[str, ...] = ()
+    
+    # Init script snippets, shipped to each context as a single script
+    _init_script_parts: list[str] = []
+    _compiled_init_script = ""
+    
+    def __init__(self, pool: Optional[BrowserPool] = None):
+        self.pool = pool
         self.browser: Optional[Browser] = None
+        self.context: Optional[BrowserContext] = None
         self.page: Optional[Page] = None
+        # Session file the current context was created from, if any
+        self.restored_state: Optional[str] = None
+        
+    @classmethod
+    async def shared_browser(cls, headless: bool = False) -> Browser:
+        """Return the process-wide browser, launching it on first use
+        
+        If CDP_WS_URL is set, connect to that already running Chromium instead
+        of launching one, e.g. `python src/browser_daemon.py` with
+        CDP_WS_URL=http://localhost:9222; falls back to launching if nothing is listening
+        """
+        async with BaseCarrier._shared_lock:
+            if BaseCarrier._shared_browser is None or not BaseCarrier._shared_browser.is_connected():
+                playwright = await get_playwright()
+                cdp_url = os.environ.get("CDP_WS_URL")
+                BaseCarrier._shared_browser = None
+                if cdp_url:
+                    from playwright.async_api import Error as PlaywrightError
+                    _get_logger().info(f"Connecting to browser over CDP at {cdp_url}")
+                    try:
+                        BaseCarrier._shared_browser = await playwright.chromium.connect_over_cdp(cdp_url)
+                        BaseCarrier._owns_shared_browser = False
+                    except PlaywrightError as e:
+                        _get_logger().warning(f"No browser at {cdp_url} ({str(e)}), launching one instead")
+                if BaseCarrier._shared_browser is None:
+                    BaseCarrier._shared_browser = await playwright.chromium.launch(
+                        headless=headless,
+                        args=launch_args(headless)
+                    )
+                    BaseCarrier._owns_shared_browser = True
+            return BaseCarrier._shared_browser
+            
+    @classmethod
+    async def close_shared_browser(cls):
+        """Close the process-wide browser"""
+        async with BaseCarrier._shared_lock:
+            if BaseCarrier._shared_browser:
+                # Leave externally managed browsers running for the next job
+                if BaseCarrier._owns_shared_browser:
+                    await BaseCarrier._shared_browser.close()
+                BaseCarrier._shared_browser = None
+        
+    @classmethod
+    def register_init_script(cls, code: str):
+        """Register a JS snippet to run in every page this carrier opens"""
+        if "_init_script_parts" not in cls.__dict__:
+            cls._init_script_parts = []
+        cls._init_script_parts.append(code)
+        cls._compile_init_script()
+        
+    @classmethod
+    def _compile_init_script(cls):
+        """Join snippets from this class and its bases once, ahead of init_browser"""
+        parts = []
+        for klass in reversed(cls.__mro__):
+            parts.extend(klass.__dict__.get("_init_script_parts", ()))
+        cls._compiled_init_script = "\n".join(parts)
+        for subclass in cls.__subclasses__():
+            subclass._compile_init_script()
+            
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._compile_init_script()
         
     async def init_browser(self, headless: bool = False):
-        """Initialize the browser instance"""
-        playwright = await async_playwright().start()
-        self.browser = await playwright.chromium.launch(
-            headless=headless,
-            args=['--start-maximized']
-        )
-        self.page = await self.browser.new_page(
-            viewport={'width': 1920, 'height': 1080}
-        )
+        """Initialize the browser context and page"""
+        if self.pool:
+            self.browser = await self.pool.acquire()
+        else:
+            self.browser = await self.shared_browser(headless)
+            
+        # A failed setup leaves the caller nothing to close(), so hand the browser back here
+        try:
+            # Use a device descriptor so the user agent and client hints stay consistent
+            playwright = await get_playwright()
+            desktop = dict(playwright.devices["Desktop Chrome"])
+            desktop.pop("default_browser_type", None)
+            desktop["viewport"] = dict(VIEWPORT)
+            
+            # Browsers are shared between carriers, so each run gets its own context
+            self.restored_state = self.saved_storage_state()
+            self.context = await self.browser.new_context(
+                **desktop,
+                locale="en-US",
+                timezone_id="America/New_York",
+                storage_state=self.restored_state
+            )
+            if self.BLOCK_RESOURCE_TYPES or self.BLOCK_URL_PATTERNS:
+                await self.context.route("**/*", self._block_resources)
+            if self._compiled_init_script:
+                # Context-level scripts apply to every page opened in the context
+                await self.context.add_init_script(self._compiled_init_script)
+            if self.REQUIRED_PERMISSIONS:
+                await self.context.grant_permissions(list(self.REQUIRED_PERMISSIONS))
+            self.page = await self.context.new_page()
+            
+        except BaseException:
+            await self.close()
+            raise
+            
+    async def __aenter__(self):
+        await self.init_browser()
+        return self
+        
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
         
+    def saved_storage_state(self) -> Optional[str]:
+        """Return the persisted session file if one exists and is fresh enough"""
+        if not self.STORAGE_STATE_PATH or not os.path.exists(self.STORAGE_STATE_PATH):
+            return None
+        if self.STORAGE_STATE_TTL is not None:
+            age = time.time() - os.path.getmtime(self.STORAGE_STATE_PATH)
+            if age > self.STORAGE_STATE_TTL:
+                return None
+        return self.STORAGE_STATE_PATH
+        
+    async def save_storage_state(self):
+        """Persist the context's cookies and local storage for later runs"""
+        if self.STORAGE_STATE_PATH:
+            await self.context.storage_state(path=self.STORAGE_STATE_PATH)
+            
+    def clear_storage_state(self):
+        """Forget a persisted session that is no longer valid"""
+        if self.STORAGE_STATE_PATH and os.path.exists(self.STORAGE_STATE_PATH):
+            os.remove(self.STORAGE_STATE_PATH)
+            
+    async def _block_resources(self, route):
+        """Abort requests the carrier doesn't need"""
+        request = route.request
+        if (request.resource_type in self.BLOCK_RESOURCE_TYPES
+                or any(pattern in request.url for pattern in self.BLOCK_URL_PATTERNS)):
+            await route.abort()
+        else:
+            await route.continue_()
+            
     async def close(self):
-        """Close browser and cleanup"""
-        if self.browser:
-            await self.browser.close()
+        """Close the carrier's context and hand back the browser"""
+        from playwright.async_api import Error as PlaywrightError
+        
+        # Closing the context also closes its pages, so no separate page.close()
+        try:
+            if self.context:
+                await self.context.close()
+        except (PlaywrightError, ConnectionError) as e:
+            _get_logger().warning(f"Error closing browser context: {str(e)}")
+        finally:
+            # Always return pooled browsers, even if the context failed to close
+            if self.browser and self.pool:
+                await self.pool.release(self.browser)
+            self.context = None
+            self.browser = None
+            self.page = None
+            self.restored_state = None
+            
+    def ensure_page(self):
+        """Fail fast if the page is missing or closed; a local check with no browser round-trip"""
+        if self.page is None or self.page.is_closed():
+            raise Exception("Browser page is not open; call init_browser() first")
             
-    async def wait_and_click(self, selector: str, timeout: int = 5000):
-        """Wait for element and click"""
-        await self.page.wait_for_selector(selector, timeout=timeout)
-        await self.page.click(selector)
+    async def wait_and_click(self, selector: str, timeout: Optional[int] = None):
+        """Wait for the first matching element and click"""
+        await self.page.locator(selector).first.click(timeout=self.FAST_TIMEOUT_MS if timeout is None else timeout)
         
-    async def wait_and_fill(self, selector: str, value: str, timeout: int = 5000):
-        """Wait for element and fill"""
-        await self.page.wait_for_selector(selector, timeout=timeout)
-        await self.page.fill(selector, value)
+    async def wait_and_fill(self, selector: str, value: str, timeout: Optional[int] = None):
+        """Wait for the first matching element and fill"""
+        await self.page.locator(selector).first.fill(value, timeout=self.FAST_TIMEOUT_MS if timeout is None else timeout)
         
-    async def wait_for_navigation(self, timeout: int = 30000):
-        """Wait for navigation to complete"""
-        await self.page.wait_for_load_state('networkidle', timeout=timeout)
+    async def wait_for_navigation(self, idle_ms: int = 500, timeout: int = 10000):
+        """Wait for the DOM to load and the network to stay quiet for idle_ms
+        
+        Unlike Playwright's 'networkidle' this gives up after timeout instead of
+        raising, so pages with polling or keepalive requests can't stall us.
+        """
+        await self.page.wait_for_load_state('domcontentloaded', timeout=timeout)
+        
+        loop = asyncio.get_running_loop()
+        pending = set()
+        last_activity = loop.time()
+        
+        def on_request(request):
+            nonlocal last_activity
+            pending.add(request)
+            last_activity = loop.time()
+            
+        def on_request_done(request):
+            nonlocal last_activity
+            pending.discard(request)
+            last_activity = loop.time()
+            
+        self.page.on("request", on_request)
+        self.page.on("requestfinished", on_request_done)
+        self.page.on("requestfailed", on_request_done)
+        try:
+            deadline = loop.time() + timeout / 1000
+            while loop.time() < deadline:
+                if not pending and loop.time() - last_activity >= idle_ms / 1000:
+                    return
+                await asyncio.sleep(0.1)
+            _get_logger().debug(f"Network still busy after {timeout}ms ({len(pending)} pending requests)")
+        finally:
+            self.page.remove_listener("request", on_request)
+            self.page.remove_listener("requestfinished", on_request_done)
+            self.page.remove_listener("requestfailed", on_request_done)
         
     async def wait_for_element_state(self, selector: str, state: str = 'visible', timeout: int = 5000):
-        """Wait for element to reach a specific state"""
-        element = await self.page.wait_for_selector(selector, timeout=timeout)
-        await element.wait_for_element_state(state, timeout=timeout)
-        return element
+        """Wait for the first matching element to reach a specific state"""
+        # .first keeps the non-strict matching of the page-level API these helpers replaced
+        locator = self.page.locator(selector).first
+        await locator.wait_for(state=state, timeout=timeout)
+        return locator
     
     @abstractmethod
     async def login(self):
@@ -1,230 +1,475 @@
+import asyncio
 import os
+from typing import Optional
 from loguru import logger
+from playwright.async_api import Error as PWError, TimeoutError as PWTimeout
 from datetime import datetime
 from ..models.booking import BookingDetails
-from .base import BaseCarrier
+from .base import BaseCarrier, TransientError, retry_with_backoff
+from .pool import BrowserPool
+
+_BASE_URL = os.getenv("MAERSK_BASE_URL", "https://www.maersk.com")
+_USERNAME = os.getenv("MAERSK_USERNAME")
+_PASSWORD = os.getenv("MAERSK_PASSWORD")
+DEBUG_SHOTS = os.getenv("MAERSK_DEBUG", "").lower() in ("1", "true")
+
+# Fallback selectors are joined into CSS selector lists so a single query
+# matches whichever variant the page renders
+USERNAME_SEL = 'input[placeholder="Username"], input[name="username"], input[name="email"], #username, #email'
+PASSWORD_SEL = 'input[placeholder="Password"], input[name="password"], #password'
+LOGIN_BUTTON_SEL = ", ".join((
+    'button:has-text("Log in")',
+    'button[type="submit"]',
+    'input[type="submit"]',
+    'button:has-text("Login")',
+    '[data-testid*="login"]',
+    '.login-button',
+    '#login-button'
+))
+
+CITY_INPUT_SEL = 'input[placeholder="Enter city or port"]'
+COMMODITY_SEL = 'input[placeholder="Type in minimum 2 characters"], label:has-text("Commodity") + * input'
+WEIGHT_INPUT_SEL = 'input[placeholder="Enter cargo weight"]'
+DATE_INPUT_SEL = 'input[placeholder="Select date"]'
+CONTAINER_TYPE_SEL = 'text="Select container type and size"'
+INCREASE_QUANTITY_SEL = 'button[aria-label="Increase quantity"]'
+COOKIE_DIALOG_SEL = 'text="Cookie management for the best digital experience"'
+ALLOW_COOKIES_SEL = 'button:has-text("Allow all"), #onetrust-accept-btn-handler'
+# Only rendered for an authenticated session
+LOGGED_IN_SEL = '[data-testid="user-menu"], .user-menu, ' + CITY_INPUT_SEL
+# Errors count only inside the login form, not site-wide alert banners
+LOGIN_FORM_SEL = 'form:has(input[type="password"])'
+LOGIN_ERROR_SEL = f'{LOGIN_FORM_SEL} [role="alert"], {LOGIN_FORM_SEL} .error-message'
+
+# Explains a stuck login form in one round-trip: an error message or a 2FA prompt
+LOGIN_STATE_JS = """() => {
+    const form = document.querySelector('input[type="password"]')?.closest('form');
+    const error = form && form.querySelector('.error, [role="alert"], .alert-danger, .error-message');
+    return {
+        error: error ? error.textContent.trim() : null,
+        twoFactor: !!document.querySelector('input[autocomplete="one-time-code"], input[placeholder*="code" i]')
+            || /verification code|two-factor|authenticator/i.test(document.body.innerText)
+    };
+}"""
+
+# Returns the first selector present once the DOM is parsed; Playwright-only
+# selectors such as text= are not valid CSS and are skipped
+FIND_READY_JS = """(selectors) => {
+    if (document.readyState === 'loading') return null;
+    return selectors.find(s => {
+        try { return document.querySelector(s) !== null; } catch (e) { return false; }
+    }) || null;
+}"""
+
+# Sets plain inputs through the native value setter (so React sees the change)
+# and clicks options by their exact text, all in one round-trip. Returns the
+# fields and options it couldn't find so the caller can fall back.
+FILL_FORM_JS = """({ fields, clicks }) => {
+    const setValue = Object.getOwnPropertyDescriptor(HTMLInputElement.prototype, 'value').set;
+    const missing = { fields: [], clicks: [] };
+    for (const [selector, value] of fields) {
+        const el = document.querySelector(selector);
+        if (!el) { missing.fields.push([selector, value]); continue; }
+        setValue.call(el, value);
+        el.dispatchEvent(new Event('input', { bubbles: true }));
+        el.dispatchEvent(new Event('change', { bubbles: true }));
+    }
+    for (const text of clicks) {
+        const walker = document.createTreeWalker(document.body, NodeFilter.SHOW_TEXT);
+        let node, target = null;
+        while ((node = walker.nextNode())) {
+            if (node.data.trim() === text) { target = node.parentElement; break; }
+        }
+        if (target) target.click(); else missing.clicks.push(text);
+    }
+    return missing;
+}"""
+
+QUANTITY_SEL = 'input[type="number"][aria-label*="quantity" i]'
+DROPDOWN_OPTION_SEL = '[role="listbox"] [role="option"]:not([aria-disabled="true"])'
+
+# Any of these means the booking form is on screen
+READY_INDICATORS = (
+    CITY_INPUT_SEL,
+    'input[placeholder*="origin"]',
+    'input[placeholder*="destination"]',
+    ':text-is("Origin")',
+    ':text-is("Destination")'
+)
+
+_default_pool: Optional[BrowserPool] = None
+
+def get_default_pool() -> BrowserPool:
+    """Return the Maersk browser pool used by `async with MaerskCarrier()`
+    
+    Browsers launch as runs need them, up to MAERSK_POOL_SIZE, so a single run
+    only waits for one; MaerskCarrier.close_default_pool() shuts them down.
+    """
+    global _default_pool
+    if _default_pool is None:
+        _default_pool = BrowserPool(
+            size=int(os.getenv("MAERSK_POOL_SIZE", "4")),
+            headless=os.getenv("HEADLESS", "false").lower() == "true"
+        )
+    return _default_pool
 
 class MaerskCarrier(BaseCarrier):
-    def __init__(self):
-        super().__init__()
-        self.base_url = os.getenv("MAERSK_BASE_URL", "https://www.maersk.com")
-        self.username = os.getenv("MAERSK_USERNAME", "whitehouse1")
-        self.password = os.getenv("MAERSK_PASSWORD", "wHite@123")
+    __slots__ = ("base_url", "username", "password", "_cookies_accepted")
+    
+    STORAGE_STATE_PATH = ".maersk_state.json"
+    STORAGE_STATE_TTL = float(os.getenv("MAERSK_SESSION_TTL", "43200"))
+    
+    # The flows only need the DOM; stylesheets stay enabled because the
+    # visibility checks on dialogs and dropdowns depend on them
+    BLOCK_RESOURCE_TYPES = frozenset({"image", "font", "media"})
+    BLOCK_URL_PATTERNS = (
+        "google-analytics", "googletagmanager", "doubleclick", "optimizely", "segment.io", "hotjar"
+    )
+    
+    def __init__(self, pool=None):
+        super().__init__(pool)
+        if not _USERNAME or not _PASSWORD:
+            raise Exception("MAERSK_USERNAME and MAERSK_PASSWORD must be set in the environment")
+        self.base_url = _BASE_URL
+        self.username = _USERNAME
+        self.password = _PASSWORD
+        self._cookies_accepted = False
+        
+    @classmethod
+    async def close_default_pool(cls):
+        """Close the browsers of the pool used by `async with MaerskCarrier()`"""
+        global _default_pool
+        if _default_pool is not None:
+            await _default_pool.shutdown()
+            _default_pool = None
+            
+    async def init_browser(self, headless: bool = False):
+        """Initialize the browser; a fresh context hasn't consented to cookies yet"""
+        await super().init_browser(headless)
+        self._cookies_accepted = False
+        
+    async def __aenter__(self):
+        """Check out a pooled browser and log in, reusing the saved session"""
+        if self.pool is None:
+            self.pool = get_default_pool()
+        await self.init_browser()
+        try:
+            await self.login()
+        except Exception:
+            # __aexit__ doesn't run when __aenter__ fails, so give the browser back here
+            await self.close()
+            raise
+        return self
         
+    async def _debug_shot(self, name: str):
+        """Save a low-quality JPEG screenshot when MAERSK_DEBUG is enabled"""
+        if DEBUG_SHOTS:
+            await self.page.screenshot(path=f"{name}.jpg", type="jpeg", quality=40)
+        
+    async def _error_shot(self, path: str):
+        """Screenshot the page on failure without masking the original error"""
+        try:
+            await self.page.screenshot(path=path)
+        except PWError as e:
+            logger.warning(f"Could not save {path}: {str(e)}")
+            
     async def accept_cookies(self):
         """Accept cookies on the page"""
+        # Consent is stored as a cookie, so the dialog won't return in this context
+        if self._cookies_accepted:
+            return
         try:
             logger.info("Looking for cookie acceptance button...")
             
-            # Wait for cookie dialog
-            await self.page.wait_for_selector('text="Cookie management for the best digital experience"', timeout=10000)
-            
-            # Click "Allow all" button
-            allow_button = await self.page.wait_for_selector('button:has-text("Allow all")', timeout=5000)
+            # Check for the "Allow all" button without waiting; no dialog means nothing to do
+            allow_button = await self.page.query_selector(ALLOW_COOKIES_SEL)
             if allow_button:
                 await allow_button.click()
+                self._cookies_accepted = True
                 logger.info("Successfully accepted cookies")
-                await self.page.wait_for_timeout(2000)  # Wait for dialog to disappear
+                # Wait for dialog to disappear; "hidden" also covers banners that are removed
+                await self.page.locator(COOKIE_DIALOG_SEL).wait_for(state="hidden", timeout=3000)
             else:
-                logger.warning("Could not find Allow all button")
+                logger.info("No cookie dialog shown")
             
-        except Exception as e:
+        except PWError as e:
             logger.warning(f"Error accepting cookies: {str(e)}")
         
     async def login(self):
-        """Login to Maersk portal"""
+        """Login to Maersk portal, retrying timeouts and server errors with backoff"""
+        await retry_with_backoff(self._login_once)
+        
+    async def _login_once(self):
+        """Make a single login attempt"""
+        self.ensure_page()
         try:
             logger.info("Navigating to Maersk booking page...")
-            await self.page.goto(f"{self.base_url}/book/")
+            # login() retries the whole attempt, so the navigation itself doesn't
+            await self.goto("/book/", max_retries=0)
             await self.wait_for_navigation()
             
+            # A restored session lands straight on the booking form. Decide by what
+            # this context was created with, and only drop the file once the portal
+            # actually asks for credentials, not just because the page was slow
+            if self.restored_state:
+                try:
+                    shown = await self.page.wait_for_selector(f"{CITY_INPUT_SEL}, {USERNAME_SEL}", timeout=10000)
+                    if await shown.evaluate("(el, sel) => el.matches(sel)", CITY_INPUT_SEL):
+                        logger.info("Reusing saved Maersk session")
+                        return
+                    logger.info("Saved Maersk session expired, logging in again")
+                    self.clear_storage_state()
+                except PWTimeout:
+                    logger.warning("Neither the booking form nor the login form appeared; trying to log in")
+            
             # Accept cookies first
             await self.accept_cookies()
             
-            # Wait for page to be ready (reduced wait time)
-            await self.page.wait_for_load_state("domcontentloaded")
-            await self.page.wait_for_timeout(3000)  # Simple timeout instead of networkidle
-            
             # Take screenshot after cookie acceptance to see current state
-            await self.page.screenshot(path="debug_after_cookies.png")
+            await self._debug_shot("debug_after_cookies")
             
             # Look for username and password fields directly (we're already on login page)
             logger.info("Filling login form...")
             
-            # Fill username
-            username_input = await self.page.wait_for_selector('input[placeholder="Username"]', timeout=10000)
-            if username_input:
-                await username_input.fill(self.username)
-                logger.info("Username filled successfully")
-            else:
-                raise Exception("Username field not found")
-                
-            # Fill password
-            password_input = await self.page.wait_for_selector('input[placeholder="Password"]', timeout=5000)
-            if password_input:
-                await password_input.fill(self.password)
-                logger.info("Password filled successfully")
-            else:
-                raise Exception("Password field not found")
+            # Fill username and password; locators wait for the fields themselves
+            await self.page.locator(USERNAME_SEL).first.fill(self.username, timeout=10000)
+            logger.info("Username filled successfully")
+            await self.page.locator(PASSWORD_SEL).first.fill(self.password, timeout=5000)
+            logger.info("Password filled successfully")
             
             # Take screenshot after filling credentials
-            await self.page.screenshot(path="debug_credentials_filled.png")
+            await self._debug_shot("debug_credentials_filled")
             
-            # Click login button - try multiple selectors
+            # Click login button
             logger.info("Looking for login button...")
-            login_selectors = [
-                'button:has-text("Log in")',
-                'button[type="submit"]',
-                'input[type="submit"]',
-                'button:has-text("Login")',
-                '[data-testid*="login"]',
-                '.login-button',
-                '#login-button'
-            ]
-            
-            login_clicked = False
-            for selector in login_selectors:
-                try:
-                    login_button = await self.page.wait_for_selector(selector, timeout=2000)
-                    if login_button:
-                        logger.info(f"Found login button with selector: {selector}")
-                        await login_button.click()
-                        login_clicked = True
-                        break
-                except Exception as e:
-                    logger.debug(f"Login selector {selector} not found: {str(e)}")
-                    continue
-            
-            if not login_clicked:
-                # Take screenshot to see what's available
-                await self.page.screenshot(path="debug_no_login_button.png")
-                raise Exception("Could not find login button with any selector")
-            
-            # Wait for successful login
+            # A timeout here, e.g. a late cookie banner covering the button, is retried by login()
+            await self.page.locator(LOGIN_BUTTON_SEL).first.click(timeout=5000)
+            
+            # Wait for the login form to go away, or for an error message to show up
             logger.info("Waiting for successful login...")
-            await self.page.wait_for_timeout(5000)  # Simple timeout instead of navigation wait
+            await self.wait_for_login_result()
             
             # Take screenshot after login attempt
-            await self.page.screenshot(path="debug_after_login.png")
+            await self._debug_shot("debug_after_login")
             
-            # Check if we're logged in
-            page_content = await self.page.content()
-            if self.username.lower() in page_content.lower():
+            # Check if we're logged in; one union selector resolves on whichever
+            # indicator renders first, giving a post-login redirect time to land
+            try:
+                await self.page.wait_for_selector(LOGGED_IN_SEL, timeout=2000)
                 logger.info("Successfully logged into Maersk portal")
-            else:
+                await self.save_storage_state()
+            except PWTimeout:
                 logger.warning("Login status unclear - continuing with automation")
             
         except Exception as e:
             logger.error(f"Failed to login to Maersk portal: {str(e)}")
-            # Take error screenshot
-            try:
-                await self.page.screenshot(path="error_login.png")
-            except:
-                pass  # Ignore screenshot errors
+            await self._error_shot("error_login.png")
             raise
             
+    async def goto(self, path: str, max_retries: int = 3):
+        """Open a portal page, retrying timeouts and server errors with backoff"""
+        async def attempt():
+            response = await self.page.goto(f"{self.base_url}{path}")
+            if response and response.status >= 500:
+                raise TransientError(f"{path} returned HTTP {response.status}")
+            return response
+        return await retry_with_backoff(attempt, max_retries=max_retries)
+        
+    async def wait_for_login_result(self, timeout: int = 15000):
+        """Wait until the login form is gone or the portal reports an error"""
+        form_gone = asyncio.create_task(
+            self.page.wait_for_selector(PASSWORD_SEL, state="detached", timeout=timeout)
+        )
+        login_error = asyncio.create_task(
+            self.page.wait_for_selector(LOGIN_ERROR_SEL, state="visible", timeout=timeout)
+        )
+        try:
+            done, _ = await asyncio.wait({form_gone, login_error}, return_when=asyncio.FIRST_COMPLETED)
+            if login_error in done:
+                error = login_error.exception()
+                if error is None:
+                    message = await login_error.result().inner_text()
+                    raise Exception(f"Login rejected by portal: {message.strip()}")
+                if not isinstance(error, PWTimeout):
+                    raise error
+                # No error shown in time isn't a result; the form wait decides
+                await asyncio.wait({form_gone})
+        finally:
+            for task in (form_gone, login_error):
+                task.cancel()
+                
+        error = form_gone.exception()
+        if error is None:
+            return
+        if not isinstance(error, PWTimeout):
+            raise error
+        # Form is still there, so find out why with a single DOM scan
+        state = await self.page.evaluate(LOGIN_STATE_JS)
+        if state["error"]:
+            raise Exception(f"Login rejected by portal: {state['error']}")
+        if state["twoFactor"]:
+            raise Exception("Login requires two-factor verification")
+        logger.warning(f"Login form still present after {timeout}ms")
+        
+    async def wait_for_page_ready(self, ready_indicators, timeout: int = 5000) -> bool:
+        """Wait for any of ready_indicators to appear, returning False if none did in time"""
+        # Fast path: one round-trip when the page is already ready
+        if await self.page.evaluate(FIND_READY_JS, list(ready_indicators)):
+            return True
+            
+        # One selector-engine query over the whole union instead of one per indicator
+        try:
+            await self.page.wait_for_selector(", ".join(ready_indicators), timeout=timeout)
+            return True
+        except PWTimeout:
+            return False
+            
+    async def _find_booking_form(self, timeout: int):
+        """Check whether the booking form shows up within timeout"""
+        return await self.wait_for_page_ready(READY_INDICATORS, timeout=timeout)
+        
     async def navigate_to_booking(self):
         """Navigate to booking page"""
+        self.ensure_page()
         try:
-            # Check if we're already on a booking page by looking for booking form elements
-            booking_elements = [
-                'input[placeholder="Enter city or port"]',
-                'input[placeholder*="origin"]',
-                'input[placeholder*="destination"]',
-                'text="Origin"',
-                'text="Destination"'
-            ]
-            
-            # First check if we're already on the booking page
-            for element in booking_elements:
-                try:
-                    await self.page.wait_for_selector(element, timeout=2000)
-                    logger.info("Already on booking page")
-                    return
-                except:
-                    continue
+            # First check if we're already on the booking page, e.g. straight after
+            # login; only give the form time to render if the URL says it should be there
+            on_booking_url = self.page.url.rstrip("/").endswith("/book")
+            if await self._find_booking_form(timeout=2000 if on_booking_url else 500):
+                logger.info("Already on booking page")
+                return
             
             # If not on booking page, try to navigate
             logger.info("Navigating to booking page...")
-            await self.page.goto(f"{self.base_url}/book/")
-            await self.wait_for_navigation()
+            await self.goto("/book/")
             
             # Wait for booking form elements
-            for element in booking_elements:
-                try:
-                    await self.page.wait_for_selector(element, timeout=5000)
-                    logger.info("Successfully navigated to booking page")
-                    return
-                except:
-                    continue
+            if await self._find_booking_form(timeout=5000):
+                logger.info("Successfully navigated to booking page")
+                return
                     
             # Take screenshot if booking page not found
-            await self.page.screenshot(path="debug_booking_page.png")
+            await self._debug_shot("debug_booking_page")
             logger.warning("Could not find booking form elements")
             
         except Exception as e:
             logger.error(f"Failed to navigate to booking page: {str(e)}")
-            await self.page.screenshot(path="error_booking_nav.png")
+            await self._error_shot("error_booking_nav.png")
             raise
             
+    async def _fill_location(self, field, city: str):
+        """Type a city into a location field and pick the suggestion"""
+        await field.fill(city, timeout=10000)
+        try:
+            # Wait for the suggestion itself rather than sleeping a fixed time
+            await self.page.get_by_text(city, exact=True).first.wait_for(state="visible", timeout=2000)
+        except PWTimeout:
+            logger.debug(f"No suggestion shown for {city}")
+        await field.press("Enter")
+        
+    async def _wait_for_dropdown(self, timeout: int = 2000):
+        """Wait until a dropdown has a selectable option instead of sleeping a fixed time"""
+        try:
+            await self.page.wait_for_selector(DROPDOWN_OPTION_SEL, state="visible", timeout=timeout)
+        except PWTimeout:
+            logger.debug("No dropdown options appeared")
+            
+    @staticmethod
+    def _group_containers(containers):
+        """Merge containers with the same type, size and weight into one row"""
+        rows = {}
+        for container in containers:
+            key = (container.type, container.size, container.weight_kg)
+            if key in rows:
+                rows[key] = rows[key].model_copy(update={"quantity": rows[key].quantity + container.quantity})
+            else:
+                rows[key] = container
+        return list(rows.values())
+        
+    async def _set_quantity(self, quantity: int):
+        """Set the container quantity in one call, clicking "+" only if the input isn't settable"""
+        missing = await self.page.evaluate(FILL_FORM_JS, {"fields": [[QUANTITY_SEL, str(quantity)]], "clicks": []})
+        if missing["fields"]:
+            for _ in range(quantity - 1):
+                await self.wait_and_click(INCREASE_QUANTITY_SEL, timeout=10000)
+                
+    async def _fill_form_js(self, payload: dict):
+        """Apply FILL_FORM_JS, falling back to Playwright for anything it couldn't find"""
+        missing = await self.page.evaluate(FILL_FORM_JS, payload)
+        for selector, value in missing["fields"]:
+            await self.wait_and_fill(selector, value, timeout=10000)
+        # The toggles touch disjoint parts of the form, so click them concurrently
+        results = await asyncio.gather(
+            *(self.page.get_by_text(text, exact=True).first.click(timeout=10000) for text in missing["clicks"]),
+            return_exceptions=True
+        )
+        errors = [result for result in results if isinstance(result, Exception)]
+        for error in errors:
+            logger.error(f"Failed to set form option: {str(error)}")
+        if errors:
+            raise errors[0]
+            
     async def fill_booking_form(self, booking: BookingDetails):
         """Fill the booking form with provided details"""
+        # The form is filled as a single container row: the weight and quantity
+        # inputs are addressed as the first row and no further rows are added
+        rows = self._group_containers(booking.containers)
+        if len(rows) != 1:
+            raise Exception(f"Maersk bookings support one container type and size, got {len(rows)}")
+        container = rows[0]
+        
         try:
-            # Fill origin
-            await self.wait_and_fill('input[placeholder="Enter city or port"]', booking.origin.city, timeout=10000)
-            await self.page.keyboard.press("Enter")
-            await self.page.wait_for_timeout(2000)  # Wait for dropdown to appear
-            
-            # Fill destination
-            await self.page.locator('input[placeholder="Enter city or port"]').nth(1).fill(booking.destination.city)
-            await self.page.keyboard.press("Enter")
-            await self.page.wait_for_timeout(2000)  # Wait for dropdown to appear
+            # Resolve the locators once; they re-query lazily on each action
+            city_inputs = self.page.locator(CITY_INPUT_SEL)
+            commodity_input = self.page.locator(COMMODITY_SEL).first
+            weight_input = self.page.locator(WEIGHT_INPUT_SEL).first
+            date_str = booking.ready_date.strftime("%d %b %Y")
             
-            # Select inland transportation options
-            if booking.origin_transport.type == "SD":
-                await self.wait_and_click('text="I want Maersk to pick up the container at my facility"', timeout=10000)
+            # Fill origin and destination; these stay sequential because each
+            # autocomplete closes its suggestions when focus moves to the other
+            await self._fill_location(city_inputs.nth(0), booking.origin.city)
+            await self._fill_location(city_inputs.nth(1), booking.destination.city)
             
-            if booking.destination_transport.type == "SD":
-                await self.wait_and_click('text="I want Maersk to deliver the container at my facility"', timeout=10000)
-                
             # Fill commodity
-            await self.wait_and_fill('input[placeholder="Type in minimum 2 characters"]', booking.commodity, timeout=10000)
-            await self.page.keyboard.press("Enter")
-            await self.page.wait_for_timeout(2000)  # Wait for dropdown to appear
+            # The location fills proved the form is interactive, so skip the
+            # actionability polling on the remaining plain inputs
+            await commodity_input.fill(booking.commodity, force=True, no_wait_after=True, timeout=10000)
+            await self._wait_for_dropdown()
+            await commodity_input.press("Enter")
             
-            # Handle temperature control and dangerous cargo
+            # Set the plain inputs and toggles in one round-trip. This runs before the
+            # container selection because temperature control changes the container list
+            clicks = []
+            if booking.origin_transport.type == "SD":
+                clicks.append("I want Maersk to pick up the container at my facility")
+            if booking.destination_transport.type == "SD":
+                clicks.append("I want Maersk to deliver the container at my facility")
             if booking.requires_temperature_control:
-                await self.wait_and_click('text="This cargo requires temperature control"', timeout=10000)
-            
+                clicks.append("This cargo requires temperature control")
             if booking.is_dangerous_cargo:
-                await self.wait_and_click('text="This cargo is considered dangerous"', timeout=10000)
-                
-            # Select container type
-            for container in booking.containers:
-                await self.wait_and_click('text="Select container type and size"', timeout=10000)
-                await self.page.wait_for_timeout(2000)  # Wait for dropdown to appear
-                await self.wait_and_click(f'text="{container.type} {container.size}"', timeout=10000)
-                
-                # Set quantity
-                if container.quantity > 1:
-                    for _ in range(container.quantity - 1):
-                        await self.wait_and_click('button[aria-label="Increase quantity"]', timeout=10000)
-                
-                # Set weight
-                await self.wait_and_fill('input[placeholder="Enter cargo weight"]', str(container.weight_kg), timeout=10000)
+                clicks.append("This cargo is considered dangerous")
+            if booking.is_price_owner:
+                clicks.append("I am the price owner")
+            await self._fill_form_js({
+                "fields": [[DATE_INPUT_SEL, date_str]],
+                "clicks": clicks
+            })
                 
-            # Set ready date
-            date_str = booking.ready_date.strftime("%d %b %Y")
-            await self.wait_and_fill('input[placeholder="Select date"]', date_str, timeout=10000)
+            # Select container type; identical lines were merged into this one row
+            await self.wait_and_click(CONTAINER_TYPE_SEL, timeout=10000)
+            await self._wait_for_dropdown()
+            await self.page.get_by_text(f"{container.type} {container.size}", exact=True).first.click(timeout=10000)
             
-            # Set price owner
-            if booking.is_price_owner:
-                await self.wait_and_click('text="I am the price owner"', timeout=10000)
+            # Set quantity
+            if container.quantity > 1:
+                await self._set_quantity(container.quantity)
+            
+            # Set weight
+            await weight_input.fill(str(container.weight_kg), force=True, no_wait_after=True, timeout=10000)
             
             logger.info("Successfully filled booking form")
             
         except Exception as e:
             logger.error(f"Failed to fill booking form: {str(e)}")
-            # Take error screenshot
-            await self.page.screenshot(path="error_booking.png")
+            await self._error_shot("error_booking.png")
             raise 
\ No newline at end of file
@@ -0,0 +1,121 @@
+import asyncio
+from typing import Dict, List, Optional
+from playwright.async_api import Browser, Playwright, Error as PlaywrightError
+from loguru import logger
+from .base import get_playwright, launch_args
+
+class BrowserPool:
+    """Pool of Chromium instances shared across carrier runs, launched on demand"""
+
+    def __init__(self, size: int = 2, headless: bool = False, browser_args: Optional[List[str]] = None,
+                 max_uses: int = 50):
+        self.size = size
+        self.headless = headless
+        self.max_uses = max_uses
+        self.browser_args = browser_args if browser_args is not None else launch_args(headless)
+        self.playwright: Optional[Playwright] = None
+        self._idle: List[Browser] = []
+        self._browsers: List[Browser] = []
+        self._uses: Dict[Browser, int] = {}
+        # Browsers running or being launched; reserved before any await so
+        # concurrent acquires can't launch more than size between them
+        self._launched = 0
+        # Signalled whenever a browser goes idle or a launch slot frees up
+        self._available = asyncio.Condition()
+
+    async def start(self):
+        """Optionally pre-warm the rest of the pool, launching the browsers in parallel"""
+        async with self._available:
+            missing = self.size - self._launched
+            if missing <= 0:
+                return
+            self._launched += missing
+        logger.info(f"Starting {missing} pooled browser(s)...")
+        results = await asyncio.gather(*(self._launch() for _ in range(missing)), return_exceptions=True)
+        errors = []
+        async with self._available:
+            for result in results:
+                if isinstance(result, BaseException):
+                    self._launched -= 1
+                    errors.append(result)
+                else:
+                    self._idle.append(result)
+            self._available.notify_all()
+        if errors:
+            raise errors[0]
+            
+    async def _launch(self) -> Browser:
+        """Launch a new pooled browser"""
+        if self.playwright is None:
+            self.playwright = await get_playwright()
+        browser = await self.playwright.chromium.launch(
+            headless=self.headless,
+            args=self.browser_args
+        )
+        self._browsers.append(browser)
+        self._uses[browser] = 0
+        return browser
+
+    async def _free_slot(self):
+        """Give up a launch slot and wake a waiter to launch into it"""
+        async with self._available:
+            self._launched -= 1
+            self._available.notify()
+
+    async def acquire(self) -> Browser:
+        """Take an idle browser, launching one while under size, else wait for a release"""
+        async with self._available:
+            # Re-checked on every wakeup, so a slot freed by a failed launch gets used
+            await self._available.wait_for(lambda: self._idle or self._launched < self.size)
+            if self._idle:
+                browser = self._idle.pop()
+                self._uses[browser] += 1
+                return browser
+            self._launched += 1
+        try:
+            browser = await self._launch()
+        except BaseException:
+            await self._free_slot()
+            raise
+        self._uses[browser] += 1
+        return browser
+
+    async def release(self, browser: Browser):
+        """Return a browser to the pool"""
+        if browser not in self._uses:
+            # Checked out before shutdown(), which already closed it
+            return
+        if browser.is_connected() and self._uses[browser] < self.max_uses:
+            async with self._available:
+                self._idle.append(browser)
+                self._available.notify()
+            return
+            
+        # Drop browsers that crashed, or recycle long-lived ones to cap memory growth
+        if browser.is_connected():
+            logger.info(f"Recycling pooled browser after {self._uses[browser]} uses")
+            try:
+                await browser.close()
+            except (PlaywrightError, ConnectionError) as e:
+                logger.warning(f"Error closing pooled browser: {str(e)}")
+        else:
+            logger.warning("Pooled browser disconnected, dropping it")
+        self._browsers.remove(browser)
+        del self._uses[browser]
+        # The next or a waiting acquire() launches a fresh browser into the slot
+        await self._free_slot()
+
+    async def shutdown(self):
+        """Close every pooled browser"""
+        for browser in self._browsers:
+            try:
+                await browser.close()
+            except (PlaywrightError, ConnectionError) as e:
+                logger.warning(f"Error closing pooled browser: {str(e)}")
+        self._browsers.clear()
+        self._uses.clear()
+        async with self._available:
+            self._idle.clear()
+            self._launched = 0
+            self._available.notify_all()
+        self.playwright = None
@@ -1,59 +1,97 @@
 import asyncio
-import os
+import inspect
 import sys
+import threading
+import types
 from datetime import datetime, timedelta
+from pathlib import Path
 from loguru import logger
-from dotenv import load_dotenv
 
 # Add the project root directory to Python path
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
 
-from src.carriers.maersk import MaerskCarrier
+from src.carriers.base import stop_playwright
+from src.carriers.maersk import DEBUG_SHOTS, MaerskCarrier
+from src.runtime import run
 from src.models.booking import (
     BookingDetails, Location, Container, 
     InlandTransport
 )
 
+def patch_playwright_stack():
+    """Stop Playwright reading source context for every API call it records
+    
+    Playwright 1.42 calls inspect.stack() on each API call, which loads the
+    surrounding source lines of every frame; only file, line and function are used.
+    """
+    from playwright._impl import _connection
+    
+    shim = types.SimpleNamespace(**vars(inspect))
+    # Drop the lambda's own frame so Playwright still sees the caller's frame first
+    shim.stack = lambda context=0: inspect.stack(context)[1:]
+    _connection.inspect = shim
+
+async def wait_for_inspection(page, timeout: float = 30):
+    """Keep the browser open until it is closed, Enter is pressed or the timeout expires"""
+    loop = asyncio.get_running_loop()
+    done = asyncio.Event()
+    page.on("close", lambda _: done.set())
+    
+    def read_stdin():
+        sys.stdin.readline()
+        loop.call_soon_threadsafe(done.set)
+    
+    # Daemon thread so a pending readline never blocks interpreter shutdown
+    threading.Thread(target=read_stdin, daemon=True).start()
+    try:
+        await asyncio.wait_for(done.wait(), timeout=timeout)
+    except asyncio.TimeoutError:
+        pass
+
+def make_sample_booking() -> BookingDetails:
+    """Build the sample booking used to exercise the Maersk form"""
+    return BookingDetails(
+        origin=Location(
+            city="New York",
+            country="USA",
+            is_port=True
+        ),
+        destination=Location(
+            city="Hamburg", 
+            country="Germany",
+            is_port=True
+        ),
+        origin_transport=InlandTransport(
+            type="SD",  # Store Door
+            is_pickup=True
+        ),
+        destination_transport=InlandTransport(
+            type="SD",  # Store Door
+            is_pickup=False
+        ),
+        containers=[
+            Container(
+                type="DRY",
+                size="20",
+                quantity=1,
+                weight_kg=15000
+            )
+        ],
+        commodity="Electronics",
+        ready_date=datetime.now() + timedelta(days=7),
+        requires_temperature_control=False,
+        is_dangerous_cargo=False,
+        is_price_owner=True
+    )
+
 async def main():
     """Main function to test Maersk automation"""
     try:
         # Configure logging
-        logger.add("logs/automation.log", rotation="10 MB")
-        
-        # Create sample booking details
-        booking = BookingDetails(
-            origin=Location(
-                city="New York",
-                country="USA",
-                is_port=True
-            ),
-            destination=Location(
-                city="Hamburg", 
-                country="Germany",
-                is_port=True
-            ),
-            origin_transport=InlandTransport(
-                type="SD",  # Store Door
-                is_pickup=True
-            ),
-            destination_transport=InlandTransport(
-                type="SD",  # Store Door
-                is_pickup=False
-            ),
-            containers=[
-                Container(
-                    type="DRY",
-                    size="20",
-                    quantity=1,
-                    weight_kg=15000
-                )
-            ],
-            commodity="Electronics",
-            ready_date=datetime.now() + timedelta(days=7),
-            requires_temperature_control=False,
-            is_dangerous_cargo=False,
-            is_price_owner=True
-        )
+        logger.add("logs/automation.log", rotation="10 MB", enqueue=True, backtrace=False, diagnose=False)
+        if not DEBUG_SHOTS:
+            patch_playwright_stack()
         
         # Initialize carrier
         logger.info("Initializing Maersk carrier...")
@@ -63,7 +101,7 @@ async def main():
         logger.info("Starting browser automation...")
         await carrier.init_browser(headless=False)
         
-        # Login
+        # Login; timeouts and server errors back off and retry, rejected credentials fail fast
         logger.info("Attempting login...")
         await carrier.login()
         
@@ -71,21 +109,24 @@ async def main():
         
         # Temporarily comment out booking steps to test login
         # await carrier.navigate_to_booking()
-        # await carrier.fill_booking_form(booking)
+        # await carrier.fill_booking_form(make_sample_booking())
         
         # Keep browser open for inspection
-        logger.info("Keeping browser open for inspection. Press Ctrl+C to close.")
-        await asyncio.sleep(30)  # Keep browser open for 30 seconds
+        logger.info("Keeping browser open for inspection. Press Enter or close the window to finish.")
+        await wait_for_inspection(carrier.page, timeout=30)
         
         # Close browser
         await carrier.close()
+        await MaerskCarrier.close_shared_browser()
+        await MaerskCarrier.close_default_pool()
+        await stop_playwright()
         
         logger.info("Automation completed successfully!")
+        await logger.complete()
         
     except Exception as e:
         logger.error(f"Error during automation: {str(e)}")
         raise
 
 if __name__ == "__main__":
-    load_dotenv()
-    asyncio.run(main()) 
\ No newline at end of file
+    run(main()) 
\ No newline at end of file
@@ -1,23 +1,31 @@
 from datetime import datetime
 from typing import Optional, List
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 class Location(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="forbid")
+    
     city: str
     country: str
     is_port: bool = False
     
 class InlandTransport(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="forbid")
+    
     type: str = Field(..., description="CY (Customer Yard) or SD (Store Door)")
     is_pickup: bool
     
 class Container(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="forbid")
+    
     type: str
     size: str
     quantity: int = 1
     weight_kg: float
     
 class BookingDetails(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="forbid")
+    
     origin: Location
     destination: Location
     origin_transport: InlandTransport
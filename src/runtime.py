@@ -0,0 +1,10 @@
+import asyncio
+
+def run(coro):
+    """Run an entry point's coroutine on uvloop if it is installed, else on asyncio's default loop"""
+    try:
+        import uvloop
+    except ImportError:
+        return asyncio.run(coro)
+    with asyncio.Runner(loop_factory=uvloop.new_event_loop) as runner:
+        return runner.run(coro)
@@ -0,0 +1,186 @@
+import asyncio
+import os
+import time
+
+import pytest
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+from src.carriers import base
+from src.carriers import pool as pool_module
+from src.carriers.pool import BrowserPool
+from src.carriers.base import BaseCarrier, TransientError, retry_with_backoff
+
+class DummyCarrier(BaseCarrier):
+    __slots__ = ()
+    
+    async def login(self):
+        pass
+        
+    async def navigate_to_booking(self):
+        pass
+        
+    async def fill_booking_form(self, booking_details):
+        pass
+
+class FakeLocator:
+    def __init__(self, calls):
+        self.calls = calls
+        
+    @property
+    def first(self):
+        self.calls.append("first")
+        return self
+        
+    async def click(self, timeout=None):
+        self.calls.append(("click", timeout))
+        
+    async def fill(self, value, timeout=None):
+        self.calls.append(("fill", value, timeout))
+
+class FakePage:
+    def __init__(self):
+        self.calls = []
+        
+    def locator(self, selector):
+        return FakeLocator(self.calls)
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Record backoff delays instead of sleeping"""
+    delays = []
+    
+    async def fake_sleep(delay):
+        delays.append(delay)
+        
+    monkeypatch.setattr(base.asyncio, "sleep", fake_sleep)
+    return delays
+
+async def test_retry_returns_after_transient_failures(sleeps):
+    outcomes = [TransientError("502"), PlaywrightTimeoutError("slow"), "done"]
+    
+    async def func():
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+        
+    assert await retry_with_backoff(func, jitter=0) == "done"
+    assert sleeps == [1.0, 2.0]
+
+async def test_retry_caps_delay_and_reraises_last_error(sleeps):
+    calls = 0
+    
+    async def func():
+        nonlocal calls
+        calls += 1
+        raise TransientError("503")
+        
+    with pytest.raises(TransientError):
+        await retry_with_backoff(func, max_retries=4, base=1.0, cap=5.0, jitter=0)
+    assert calls == 5
+    assert sleeps == [1.0, 2.0, 4.0, 5.0]
+
+async def test_retry_jitter_stays_within_bounds(sleeps):
+    async def func():
+        raise TransientError("503")
+        
+    with pytest.raises(TransientError):
+        await retry_with_backoff(func, max_retries=3, base=1.0, jitter=0.5)
+    for attempt, delay in enumerate(sleeps):
+        assert 2 ** attempt <= delay <= 2 ** attempt * 1.5
+
+async def test_retry_does_not_retry_other_errors(sleeps):
+    calls = 0
+    
+    async def func():
+        nonlocal calls
+        calls += 1
+        raise ValueError("bad credentials")
+        
+    with pytest.raises(ValueError):
+        await retry_with_backoff(func)
+    assert calls == 1
+    assert sleeps == []
+
+async def test_wait_and_helpers_use_first_match():
+    carrier = DummyCarrier()
+    carrier.page = FakePage()
+    await carrier.wait_and_click("button")
+    await carrier.wait_and_fill("input", "x")
+    assert carrier.page.calls[0] == "first"
+    assert carrier.page.calls[2] == "first"
+
+async def test_wait_and_helpers_default_to_fast_timeout():
+    carrier = DummyCarrier()
+    carrier.page = FakePage()
+    await carrier.wait_and_click("button")
+    await carrier.wait_and_fill("input", "x")
+    assert carrier.page.calls[1] == ("click", BaseCarrier.FAST_TIMEOUT_MS)
+    assert carrier.page.calls[3] == ("fill", "x", BaseCarrier.FAST_TIMEOUT_MS)
+
+async def test_wait_and_helpers_keep_explicit_zero_timeout():
+    carrier = DummyCarrier()
+    carrier.page = FakePage()
+    await carrier.wait_and_click("button", timeout=0)
+    assert carrier.page.calls[-1] == ("click", 0)
+
+def test_saved_storage_state_without_path():
+    assert DummyCarrier().saved_storage_state() is None
+
+def test_saved_storage_state_missing_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(DummyCarrier, "STORAGE_STATE_PATH", str(tmp_path / "state.json"))
+    assert DummyCarrier().saved_storage_state() is None
+
+def test_saved_storage_state_respects_ttl(tmp_path, monkeypatch):
+    path = tmp_path / "state.json"
+    path.write_text("{}")
+    monkeypatch.setattr(DummyCarrier, "STORAGE_STATE_PATH", str(path))
+    monkeypatch.setattr(DummyCarrier, "STORAGE_STATE_TTL", 60.0)
+    assert DummyCarrier().saved_storage_state() == str(path)
+    
+    stale = time.time() - 120
+    os.utime(path, (stale, stale))
+    assert DummyCarrier().saved_storage_state() is None
+
+def test_saved_storage_state_without_ttl_never_expires(tmp_path, monkeypatch):
+    path = tmp_path / "state.json"
+    path.write_text("{}")
+    os.utime(path, (0, 0))
+    monkeypatch.setattr(DummyCarrier, "STORAGE_STATE_PATH", str(path))
+    assert DummyCarrier().saved_storage_state() == str(path)
+
+class BrokenBrowser:
+    """A browser that launches but can't open a context"""
+    
+    def is_connected(self):
+        return True
+        
+    async def new_context(self, **kwargs):
+        raise RuntimeError("context failed")
+        
+    async def close(self):
+        pass
+
+class BrokenChromium:
+    async def launch(self, **kwargs):
+        return BrokenBrowser()
+
+class FakePlaywright:
+    devices = {"Desktop Chrome": {"user_agent": "test", "default_browser_type": "chromium"}}
+    chromium = BrokenChromium()
+
+async def test_init_browser_releases_pooled_browser_on_failure(monkeypatch):
+    async def get_playwright():
+        return FakePlaywright()
+        
+    monkeypatch.setattr(base, "get_playwright", get_playwright)
+    monkeypatch.setattr(pool_module, "get_playwright", get_playwright)
+    pool = BrowserPool(size=1)
+    carrier = DummyCarrier(pool)
+    
+    with pytest.raises(RuntimeError):
+        async with carrier:
+            pass
+    assert carrier.browser is None
+    # The only pooled browser went back, so this doesn't wait forever
+    await asyncio.wait_for(pool.acquire(), timeout=1)
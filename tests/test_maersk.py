@@ -0,0 +1,191 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+from playwright.async_api import TimeoutError as PWTimeout
+
+from src.carriers import maersk
+from src.carriers.maersk import LOGIN_ERROR_SEL, PASSWORD_SEL, MaerskCarrier
+from src.models.booking import BookingDetails, Container, InlandTransport, Location
+
+def container(type="DRY", size="20", quantity=1, weight_kg=15000):
+    return Container(type=type, size=size, quantity=quantity, weight_kg=weight_kg)
+
+def booking(containers):
+    return BookingDetails(
+        origin=Location(city="New York", country="USA", is_port=True),
+        destination=Location(city="Hamburg", country="Germany", is_port=True),
+        origin_transport=InlandTransport(type="SD", is_pickup=True),
+        destination_transport=InlandTransport(type="SD", is_pickup=False),
+        containers=containers,
+        commodity="Electronics",
+        ready_date=datetime(2026, 1, 1)
+    )
+
+@pytest.fixture
+def carrier(monkeypatch):
+    monkeypatch.setattr(maersk, "_USERNAME", "user")
+    monkeypatch.setattr(maersk, "_PASSWORD", "secret")
+    return MaerskCarrier()
+
+class FakeErrorElement:
+    async def inner_text(self):
+        return " Wrong password "
+
+class FakeLoginPage:
+    """Resolves each login wait after a delay, with an element or a timeout"""
+    
+    def __init__(self, outcomes, state=None):
+        self.outcomes = outcomes
+        self.state = state or {"error": None, "twoFactor": False}
+        self.evaluated = False
+        
+    async def wait_for_selector(self, selector, state=None, timeout=None):
+        delay, result = self.outcomes[selector]
+        await asyncio.sleep(delay)
+        if isinstance(result, Exception):
+            raise result
+        return result
+        
+    async def evaluate(self, script):
+        self.evaluated = True
+        return self.state
+
+async def test_login_result_returns_when_form_goes_away(carrier):
+    carrier.page = FakeLoginPage({
+        PASSWORD_SEL: (0, None),
+        LOGIN_ERROR_SEL: (1, PWTimeout("no error")),
+    })
+    await carrier.wait_for_login_result(timeout=1000)
+    assert not carrier.page.evaluated
+
+async def test_login_result_raises_on_error_message(carrier):
+    carrier.page = FakeLoginPage({
+        PASSWORD_SEL: (1, PWTimeout("still there")),
+        LOGIN_ERROR_SEL: (0, FakeErrorElement()),
+    })
+    with pytest.raises(Exception, match="Wrong password"):
+        await carrier.wait_for_login_result(timeout=1000)
+
+async def test_login_result_classifies_when_error_wait_times_out_first(carrier):
+    carrier.page = FakeLoginPage({
+        PASSWORD_SEL: (0.02, PWTimeout("still there")),
+        LOGIN_ERROR_SEL: (0.01, PWTimeout("no error")),
+    }, state={"error": None, "twoFactor": True})
+    with pytest.raises(Exception, match="two-factor"):
+        await carrier.wait_for_login_result(timeout=20)
+    assert carrier.page.evaluated
+
+async def test_login_result_waits_for_form_after_error_wait_times_out(carrier):
+    carrier.page = FakeLoginPage({
+        PASSWORD_SEL: (0.02, None),
+        LOGIN_ERROR_SEL: (0.01, PWTimeout("no error")),
+    })
+    await carrier.wait_for_login_result(timeout=20)
+    assert not carrier.page.evaluated
+
+def test_group_containers_merges_identical_lines():
+    rows = MaerskCarrier._group_containers([
+        container(quantity=1),
+        container(type="REEF"),
+        container(quantity=2),
+    ])
+    assert [(row.type, row.quantity) for row in rows] == [("DRY", 3), ("REEF", 1)]
+
+def test_group_containers_keeps_different_weights_apart():
+    rows = MaerskCarrier._group_containers([container(weight_kg=1000), container(weight_kg=2000)])
+    assert len(rows) == 2
+
+async def test_fill_booking_form_rejects_multiple_rows(carrier):
+    with pytest.raises(Exception, match="one container type"):
+        await carrier.fill_booking_form(booking([container(), container(size="40")]))
+
+class ReachedLoginForm(Exception):
+    pass
+
+class FakeProbePage:
+    """Shows the booking form, the login form, or nothing within the timeout"""
+    
+    def __init__(self, shows):
+        self.shows = shows
+        
+    def is_closed(self):
+        return False
+        
+    async def wait_for_selector(self, selector, timeout=None):
+        if self.shows is None:
+            raise PWTimeout("slow page")
+        return self
+        
+    async def evaluate(self, script, selector):
+        return self.shows == "booking"
+        
+    async def screenshot(self, **kwargs):
+        pass
+
+@pytest.fixture
+def probe(carrier, monkeypatch):
+    """Run one login attempt up to the login form, recording session clears"""
+    cleared = []
+    
+    async def noop(*args, **kwargs):
+        pass
+        
+    async def stop(self):
+        raise ReachedLoginForm()
+        
+    monkeypatch.setattr(MaerskCarrier, "goto", noop)
+    monkeypatch.setattr(MaerskCarrier, "wait_for_navigation", noop)
+    monkeypatch.setattr(MaerskCarrier, "accept_cookies", stop)
+    monkeypatch.setattr(MaerskCarrier, "clear_storage_state", lambda self: cleared.append(True))
+    
+    async def run(shows, restored_state):
+        carrier.page = FakeProbePage(shows)
+        carrier.restored_state = restored_state
+        try:
+            await carrier._login_once()
+            return "reused", cleared
+        except ReachedLoginForm:
+            return "login", cleared
+    return run
+
+async def test_restored_session_is_reused(probe):
+    assert await probe("booking", ".maersk_state.json") == ("reused", [])
+
+async def test_expired_session_is_cleared(probe):
+    assert await probe("login", ".maersk_state.json") == ("login", [True])
+
+async def test_slow_page_keeps_the_session(probe):
+    assert await probe(None, ".maersk_state.json") == ("login", [])
+
+async def test_context_without_state_skips_the_probe(probe):
+    assert await probe("booking", None) == ("login", [])
+
+class FakeLoginFormLocator:
+    @property
+    def first(self):
+        return self
+        
+    async def fill(self, value, timeout=None):
+        pass
+        
+    async def click(self, timeout=None):
+        raise PWTimeout("button covered")
+
+class FakeLoginFormPage(FakeProbePage):
+    def __init__(self):
+        super().__init__(None)
+        
+    def locator(self, selector):
+        return FakeLoginFormLocator()
+
+async def test_login_button_timeout_stays_retryable(carrier, monkeypatch):
+    async def noop(*args, **kwargs):
+        pass
+        
+    monkeypatch.setattr(MaerskCarrier, "goto", noop)
+    monkeypatch.setattr(MaerskCarrier, "wait_for_navigation", noop)
+    monkeypatch.setattr(MaerskCarrier, "accept_cookies", noop)
+    carrier.page = FakeLoginFormPage()
+    with pytest.raises(PWTimeout):
+        await carrier._login_once()
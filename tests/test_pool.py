@@ -0,0 +1,128 @@
+import asyncio
+
+import pytest
+
+from src.carriers import pool as pool_module
+from src.carriers.pool import BrowserPool
+
+class FakeBrowser:
+    def __init__(self):
+        self.connected = True
+        self.closed = False
+        
+    def is_connected(self):
+        return self.connected
+        
+    async def close(self):
+        self.closed = True
+        self.connected = False
+
+class FakeChromium:
+    def __init__(self):
+        self.launched = []
+        self.failures = 0
+        
+    async def launch(self, **kwargs):
+        # Yield so concurrent acquires really interleave
+        await asyncio.sleep(0)
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("launch failed")
+        browser = FakeBrowser()
+        self.launched.append(browser)
+        return browser
+
+class FakePlaywright:
+    def __init__(self):
+        self.chromium = FakeChromium()
+
+@pytest.fixture
+def playwright(monkeypatch):
+    fake = FakePlaywright()
+    
+    async def get_playwright():
+        return fake
+        
+    monkeypatch.setattr(pool_module, "get_playwright", get_playwright)
+    return fake
+
+async def test_concurrent_acquires_launch_at_most_size(playwright):
+    pool = BrowserPool(size=4)
+    browsers = await asyncio.gather(*(pool.acquire() for _ in range(4)))
+    assert len(set(browsers)) == 4
+    assert len(playwright.chromium.launched) == 4
+
+async def test_release_after_shutdown_is_ignored(playwright):
+    pool = BrowserPool(size=1)
+    browser = await pool.acquire()
+    await pool.shutdown()
+    await pool.release(browser)
+    assert browser.closed
+    
+    # The pool can be used again after a shutdown
+    assert await pool.acquire() is not browser
+
+async def test_acquire_launches_on_demand(playwright):
+    pool = BrowserPool(size=4)
+    await pool.acquire()
+    assert len(playwright.chromium.launched) == 1
+
+async def test_acquire_waits_for_release_when_full(playwright):
+    pool = BrowserPool(size=1)
+    browser = await pool.acquire()
+    waiter = asyncio.create_task(pool.acquire())
+    await asyncio.sleep(0)
+    assert not waiter.done()
+    
+    await pool.release(browser)
+    assert await waiter is browser
+    assert len(playwright.chromium.launched) == 1
+
+async def test_start_prewarms_in_parallel_once(playwright):
+    pool = BrowserPool(size=3)
+    await asyncio.gather(pool.start(), pool.start())
+    assert len(playwright.chromium.launched) == 3
+    await pool.acquire()
+    assert len(playwright.chromium.launched) == 3
+
+async def test_release_recycles_after_max_uses(playwright):
+    pool = BrowserPool(size=1, max_uses=2)
+    browser = await pool.acquire()
+    await pool.release(browser)
+    assert await pool.acquire() is browser
+    await pool.release(browser)
+    
+    assert browser.closed
+    replacement = await pool.acquire()
+    assert replacement is not browser
+    assert len(playwright.chromium.launched) == 2
+
+async def test_release_replaces_disconnected_browser(playwright):
+    pool = BrowserPool(size=1)
+    browser = await pool.acquire()
+    browser.connected = False
+    await pool.release(browser)
+    
+    replacement = await pool.acquire()
+    assert replacement is not browser
+    assert replacement.is_connected()
+
+async def test_failed_launch_hands_its_slot_to_a_waiter(playwright):
+    pool = BrowserPool(size=1)
+    playwright.chromium.failures = 1
+    first = asyncio.create_task(pool.acquire())
+    second = asyncio.create_task(pool.acquire())
+    
+    results = await asyncio.wait_for(asyncio.gather(first, second, return_exceptions=True), timeout=1)
+    assert isinstance(results[0], RuntimeError)
+    assert isinstance(results[1], FakeBrowser)
+
+async def test_recycled_slot_goes_to_a_waiter(playwright):
+    pool = BrowserPool(size=1, max_uses=1)
+    browser = await pool.acquire()
+    waiter = asyncio.create_task(pool.acquire())
+    await asyncio.sleep(0)
+    
+    await pool.release(browser)
+    replacement = await asyncio.wait_for(waiter, timeout=1)
+    assert replacement is not browser